@@ -107,6 +107,14 @@ class TestSetLibrary:
                            json={"path": "/nonexistent/dir"})
         assert resp.status_code == 404
 
+    def test_config_saved_only_when_directory_changes(self, library_with_pdfs, monkeypatch):
+        saves = []
+        monkeypatch.setattr(srv, "_save_config", lambda cfg: saves.append(dict(cfg)))
+        state.set_library(library_with_pdfs)
+        state.set_library(library_with_pdfs)
+        assert len(saves) == 1
+        assert saves[0]["last_directory"] == srv.portable_path(library_with_pdfs)
+
 
 # ---------------------------------------------------------------------------
 # GET /api/library
@@ -132,6 +140,11 @@ class TestGetLibrary:
         assert data["total"] == 1
         assert data["scores"][0]["composer"] == "Bach"
 
+    def test_text_search_matches_title_not_across_fields(self, client, library_with_pdfs):
+        state.set_library(library_with_pdfs)
+        assert client.get("/api/library?q=cello").json()["total"] == 1
+        assert client.get("/api/library?q=bachcello").json()["total"] == 0
+
     def test_composer_filter(self, client, library_with_pdfs):
         state.set_library(library_with_pdfs)
         resp = client.get("/api/library?composer=Mozart")
@@ -159,6 +172,14 @@ class TestGetLibrary:
         titles = [s["title"] for s in resp.json()["scores"]]
         assert titles == sorted(titles, key=str.lower)
 
+    def test_composer_filter_keeps_other_composers_available(self, client, library_with_pdfs):
+        state.set_library(library_with_pdfs)
+        resp = client.get("/api/library?composer=Davis")
+        data = resp.json()
+        assert data["total"] == 1
+        assert {"Bach", "Davis", "Mozart"} <= set(data["composers"])
+        assert data["tags"] == ["jazz", "swing"]
+
 
 # ---------------------------------------------------------------------------
 # GET /api/pdf
@@ -895,6 +916,26 @@ class TestUpdateTags:
         assert "jazz" in score["folder_tags"]
         assert "cool" in score["filename_tags"]
 
+    def test_tag_filter_sees_updated_tags(self, client, library_with_pdfs):
+        client.post("/api/library", json={"path": library_with_pdfs})
+        client.put("/api/scores/tags", json={
+            "path": os.path.join(library_with_pdfs, "Bach - Cello Suite.pdf"),
+            "filename_tags": ["baroque"],
+        })
+        scores = client.get("/api/library?tag=baroque").json()["scores"]
+        assert [s["filename"] for s in scores] == ["Bach - Cello Suite -- baroque.pdf"]
+
+    def test_renamed_score_found_by_new_path(self, client, library_with_pdfs):
+        client.post("/api/library", json={"path": library_with_pdfs})
+        client.put("/api/scores/tags", json={
+            "path": os.path.join(library_with_pdfs, "Bach - Cello Suite.pdf"),
+            "filename_tags": ["jazz"],
+        })
+        resp = client.post("/api/recent", json={
+            "path": os.path.join(library_with_pdfs, "Bach - Cello Suite -- jazz.pdf"),
+        })
+        assert resp.status_code == 200
+
     def test_no_library_returns_400(self, client):
         resp = client.put("/api/scores/tags", json={
             "path": "/some/file.pdf",
@@ -2,6 +2,7 @@
 
 import json
 import os
+import stat
 
 import pytest
 
@@ -70,6 +71,19 @@ class TestSafeJSONLoad:
         with pytest.raises(SafeJSONError, match="Corrupt JSON"):
             SafeJSON.load(str(p))
 
+    def test_unreadable_file_raises(self, tmp_path, monkeypatch):
+        p = tmp_path / "locked.json"
+        p.write_text("{}")
+
+        def deny(*args, **kwargs):
+            raise PermissionError("denied")
+
+        # Patched rather than chmod'ed: permission bits are ignored on
+        # Windows and for root, which would make the test silently pass.
+        monkeypatch.setattr("builtins.open", deny)
+        with pytest.raises(SafeJSONError, match="Error reading"):
+            SafeJSON.load(str(p))
+
 
 class TestSafeJSONSave:
     def test_save_and_reload(self, tmp_path):
@@ -79,6 +93,15 @@ class TestSafeJSONSave:
         loaded = json.loads(p.read_text())
         assert loaded == data
 
+    @pytest.mark.parametrize("indent", [4, None])
+    def test_surrogate_escaped_path_round_trips(self, tmp_path, indent):
+        # os.scandir yields lone surrogates for non-UTF-8 filenames on POSIX;
+        # the scan cache and setlists must still load after saving them.
+        p = tmp_path / "cache.json"
+        data = {"/music/caf\udce9.pdf": {"size": 1}}
+        SafeJSON.save(str(p), data, indent=indent)
+        assert SafeJSON.load(str(p)) == data
+
     def test_save_missing_directory_raises(self):
         with pytest.raises(SafeJSONError, match="directory does not exist"):
             SafeJSON.save("/nonexistent/dir/file.json", {})
@@ -89,6 +112,60 @@ class TestSafeJSONSave:
         SafeJSON.save(str(p), {"v": 2})
         assert json.loads(p.read_text()) == {"v": 2}
 
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_existing_file_mode_preserved(self, tmp_path):
+        p = tmp_path / "data.json"
+        p.write_text("{}")
+        os.chmod(p, 0o644)
+        SafeJSON.save(str(p), {"v": 1})
+        assert stat.S_IMODE(os.stat(p).st_mode) == 0o644
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_new_file_gets_umask_default_mode(self, tmp_path):
+        p = tmp_path / "new.json"
+        umask = os.umask(0)
+        os.umask(umask)
+        SafeJSON.save(str(p), {"v": 1})
+        assert stat.S_IMODE(os.stat(p).st_mode) == 0o666 & ~umask
+
+    def test_save_succeeds_when_chmod_refused(self, tmp_path, monkeypatch):
+        p = tmp_path / "data.json"
+
+        def refuse(*args, **kwargs):
+            raise PermissionError("chmod not supported")
+
+        monkeypatch.setattr(os, "chmod", refuse)
+        SafeJSON.save(str(p), {"v": 1})
+        assert json.loads(p.read_text()) == {"v": 1}
+
+    def test_relative_path_temp_file_in_cwd(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        sources = []
+        real_replace = os.replace
+
+        def spy(src, dst):
+            sources.append(src)
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", spy)
+        SafeJSON.save("data.json", {"v": 1})
+        assert os.path.dirname(os.path.abspath(sources[0])) == str(tmp_path)
+        assert json.loads((tmp_path / "data.json").read_text()) == {"v": 1}
+
+    def test_temp_file_written_beside_destination(self, tmp_path, monkeypatch):
+        p = tmp_path / "data.json"
+        sources = []
+        real_replace = os.replace
+
+        def spy(src, dst):
+            sources.append(src)
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", spy)
+        SafeJSON.save(str(p), {"v": 1})
+        assert os.path.dirname(sources[0]) == str(tmp_path)
+        assert os.listdir(tmp_path) == ["data.json"]
+
 
 # ---------------------------------------------------------------------------
 # Score
@@ -154,12 +231,18 @@ class TestScore:
                   "Bach - Suite -- jazz blues.pdf")
         assert "jazz" in s.tags
         assert "blues" in s.tags
+        assert isinstance(s.filename_tags, frozenset)
 
     def test_folder_tags(self):
         s = Score("/music/classical/Bach - Suite.pdf",
                   "Bach - Suite.pdf", folder_tags={"classical"})
         assert "classical" in s.tags
 
+    @pytest.mark.parametrize("tags", [{"Jazz"}, frozenset({"Jazz"}), ["Jazz"]])
+    def test_folder_tags_lowercased_for_any_iterable(self, tags):
+        s = Score("/music/Jazz/Davis - Blue.pdf", "Davis - Blue.pdf", tags)
+        assert s.folder_tags == {"jazz"}
+
     def test_to_dict(self):
         s = Score("/music/Bach - Suite.pdf", "Bach - Suite.pdf")
         d = s.to_dict()
@@ -193,6 +276,15 @@ class TestScanLibrary:
         assert len(result) == 1
         assert "classical" in result[0].tags
 
+    def test_scan_shares_folder_tags_within_directory(self, tmp_path):
+        sub = tmp_path / "Jazz"
+        sub.mkdir()
+        (sub / "Davis - Blue.pdf").touch()
+        (sub / "Evans - Waltz.pdf").touch()
+        a, b = scan_library(str(tmp_path))
+        assert a.folder_tags == {"jazz"}
+        assert a.folder_tags is b.folder_tags
+
     def test_scan_nonexistent_raises(self):
         with pytest.raises(FileNotFoundError):
             scan_library("/nonexistent/path")
@@ -428,6 +520,16 @@ class TestSaveAnnotations:
         # Save without etag — no conflict check
         save_annotations(str(pdf), {"0": []}, {})
 
+    def test_sidecar_written_compact(self, tmp_path):
+        pdf = tmp_path / "score.pdf"
+        pdf.touch()
+        pages = {"0": [{"uuid": "a", "type": "ink", "points": [[0.1, 0.2], [0.3, 0.4]],
+                        "color": "black", "width": 2}]}
+        save_annotations(str(pdf), pages, {})
+        raw = (tmp_path / "score.json").read_text()
+        assert "\n" not in raw
+        assert load_annotations(str(pdf))["pages"] == pages
+
 
 # ---------------------------------------------------------------------------
 # export_annotated_pdf — intrinsic /Rotate handling
@@ -449,17 +551,46 @@ class TestExportRotation:
         doc.save(path)
         doc.close()
 
-    @staticmethod
-    def _find_red(pix) -> tuple[int, int] | None:
-        samples = pix.samples
-        n = pix.n
-        for y in range(pix.height):
-            for x in range(pix.width):
-                i = (y * pix.width + x) * n
-                r, g, b = samples[i], samples[i + 1], samples[i + 2]
-                if r > 200 and g < 100 and b < 100:
-                    return (x, y)
-        return None
+    # Byte translation tables: 1 where a sample passes the threshold, else 0.
+    _HIGH = bytes(1 if v > 200 else 0 for v in range(256))
+    _LOW = bytes(1 if v < 100 else 0 for v in range(256))
+    _DARK = bytes(1 if v < 80 else 0 for v in range(256))
+
+    @classmethod
+    def _find_red(cls, pix) -> tuple[int, int] | None:
+        """First red pixel in row-major order, as (x, y).
+
+        Each channel plane is translated to a 0/1 mask; the masks are ANDed
+        as big integers (bytewise, since every byte is 0 or 1) so the
+        per-pixel test stays in C like ``_dark_centroid``.
+        """
+        samples, n = pix.samples, pix.n
+        size = pix.width * pix.height
+        red = (int.from_bytes(samples[0::n].translate(cls._HIGH), "big")
+               & int.from_bytes(samples[1::n].translate(cls._LOW), "big")
+               & int.from_bytes(samples[2::n].translate(cls._LOW), "big"))
+        i = red.to_bytes(size, "big").find(1)
+        if i < 0:
+            return None
+        return (i % pix.width, i // pix.width)
+
+    @classmethod
+    def _dark_centroid(cls, pix) -> tuple[float, float] | None:
+        """Centroid of the dark pixels in a greyscale pixmap.
+
+        Works on whole rows and columns of the translated sample buffer so
+        the per-pixel work stays in C rather than a nested Python loop.
+        """
+        w, h = pix.width, pix.height
+        dark = pix.samples.translate(cls._DARK)
+        rows = [dark[y * w:(y + 1) * w].count(1) for y in range(h)]
+        cols = [dark[x::w].count(1) for x in range(w)]
+        total = sum(rows)
+        if not total:
+            return None
+        cx = sum(x * c for x, c in enumerate(cols)) / total
+        cy = sum(y * c for y, c in enumerate(rows)) / total
+        return cx, cy
 
     @pytest.mark.parametrize("rotation", [0, 90, 180, 270])
     def test_ink_lands_at_canonical_position(self, tmp_path, rotation):
@@ -519,20 +650,11 @@ class TestExportRotation:
         out_pdf.write_bytes(export_annotated_pdf(str(pdf)))
 
         with fitz.open(str(out_pdf)) as doc:
-            pix = doc[0].get_pixmap(dpi=72)
+            pix = doc[0].get_pixmap(dpi=72, colorspace=fitz.csGRAY)
 
-        # Find the dark glyph pixels and compute their centroid.
-        samples = pix.samples
-        n = pix.n
-        xs, ys = [], []
-        for y in range(pix.height):
-            for x in range(pix.width):
-                i = (y * pix.width + x) * n
-                if samples[i] < 80 and samples[i + 1] < 80 and samples[i + 2] < 80:
-                    xs.append(x)
-                    ys.append(y)
-        assert xs, f"No glyph pixels found for /Rotate {rotation}"
-        cx, cy = sum(xs) / len(xs), sum(ys) / len(ys)
+        centroid = self._dark_centroid(pix)
+        assert centroid is not None, f"No glyph pixels found for /Rotate {rotation}"
+        cx, cy = centroid
         ex_x, ex_y = 0.5 * pix.width, 0.5 * pix.height
         assert abs(cx - ex_x) < 30, (
             f"/Rotate {rotation}: text x off — got {cx:.0f}, expected ~{ex_x:.0f}"
@@ -541,6 +663,16 @@ class TestExportRotation:
             f"/Rotate {rotation}: text y off — got {cy:.0f}, expected ~{ex_y:.0f}"
         )
 
+    def test_export_releases_mupdf_store(self, tmp_path, monkeypatch):
+        import pymupdf as fitz
+
+        pdf = tmp_path / "score.pdf"
+        self._make_pdf(str(pdf), 0)
+        calls = []
+        monkeypatch.setattr(fitz.TOOLS, "store_shrink", lambda pct: calls.append(pct))
+        export_annotated_pdf(str(pdf))
+        assert calls == [100]
+
 
 # ---------------------------------------------------------------------------
 # build_tagged_filename
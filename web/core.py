@@ -11,6 +11,7 @@ import logging
 import os
 import re
 import shutil
+import stat
 import sys
 import tempfile
 import uuid
@@ -21,6 +22,10 @@ from dataclasses import dataclass, field
 # ---------------------------------------------------------------------------
 
 
+_WIN_DRIVE_RE = re.compile(r'^([A-Za-z]):/(.*)')
+_WSL_MOUNT_RE = re.compile(r'^/mnt/([a-zA-Z])/(.*)')
+
+
 def normalize_path(path: str) -> str:
     """Normalise a path to the OS-native separator.
 
@@ -32,11 +37,11 @@ def normalize_path(path: str) -> str:
         return path
     p = path.replace("\\", "/")
     if sys.platform != "win32":
-        m = re.match(r'^([A-Za-z]):/(.*)', p)
+        m = _WIN_DRIVE_RE.match(p)
         if m:
             p = f"/mnt/{m.group(1).lower()}/{m.group(2)}"
     else:
-        m = re.match(r'^/mnt/([a-zA-Z])/(.*)', p)
+        m = _WSL_MOUNT_RE.match(p)
         if m:
             p = f"{m.group(1).upper()}:/{m.group(2)}"
     return os.path.normpath(p)
@@ -91,6 +96,12 @@ class SafeJSONError(Exception):
     """Raised when SafeJSON cannot load or save."""
 
 
+# Process umask, read once at import while still single-threaded: querying
+# it means setting it, which would race with other request threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
 class SafeJSON:
     """Atomic JSON read/write.
 
@@ -106,15 +117,25 @@ class SafeJSON:
             with open(filepath, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except json.JSONDecodeError as e:
-            logging.error(f"Corrupt JSON in {filepath}: {e}")
+            logging.error("Corrupt JSON in %s: %s", filepath, e)
             raise SafeJSONError(f"Corrupt JSON in {filepath}: {e}") from e
         except Exception as e:
-            logging.error(f"Error reading JSON {filepath}: {e}")
+            logging.error("Error reading JSON %s: %s", filepath, e)
             raise SafeJSONError(f"Error reading {filepath}: {e}") from e
 
     @staticmethod
-    def save(filepath: str, data) -> None:
-        """Write data via a local temp file then move/copy to the destination.
+    def save(filepath: str, data, indent: int | None = 4) -> None:
+        """Write data to a temp file beside the destination, then rename over it.
+
+        The temp file lives in the destination directory so ``os.replace`` is
+        a same-filesystem atomic rename; the copy fallback is only for shares
+        that refuse renames over an existing file. mkstemp creates the temp
+        file owner-only, so it is given the existing file's mode (or the
+        umask default for a new file) before the rename installs it.
+
+        Pass ``indent=None`` for large machine-written files: the stdlib C
+        encoder is only used for compact output, pretty-printing falls back
+        to the pure-Python one.
 
         Raises SafeJSONError on failure.
         """
@@ -125,9 +146,24 @@ class SafeJSON:
                 raise SafeJSONError(
                     f"Cannot save — directory does not exist: {dir_name}"
                 )
-            fd, tmp_name = tempfile.mkstemp(text=True)
-            with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            payload = json.dumps(data, indent=indent).encode('utf-8')
+            fd, tmp_name = tempfile.mkstemp(
+                dir=dir_name or ".",
+                prefix=f".{os.path.basename(filepath)}.",
+                suffix=".tmp",
+            )
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                try:
+                    mode = stat.S_IMODE(os.stat(filepath).st_mode)
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                os.chmod(tmp_name, mode)
+            except OSError:
+                pass  # some SMB/FUSE mounts refuse chmod; keep the save
             try:
                 os.replace(tmp_name, filepath)
             except OSError:
@@ -151,57 +187,84 @@ class SafeJSON:
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class Score:
     """A single PDF score parsed from a filename.
 
     Filename convention: ``Composer - Title -- tag1 tag2.pdf``
+
+    Slotted: a library holds one of these per PDF, and the filter loop in
+    ``get_library`` reads their attributes for every request.
     """
 
     filepath: str
     filename: str
     composer: str = "Unknown"
     title: str = ""
-    folder_tags: set[str] = field(default_factory=set)
-    filename_tags: set[str] = field(default_factory=set)
+    folder_tags: frozenset[str] = frozenset()
+    filename_tags: frozenset[str] = frozenset()
     content_hash: str = ""
     mtime: float = 0.0
+    # Derived from the fields above in _parse
+    title_lower: str = field(default="", init=False, repr=False, compare=False)
+    composer_lower: str = field(default="", init=False, repr=False, compare=False)
+    search_lower: str = field(default="", init=False, repr=False, compare=False)
+    sorted_tags: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _tags: frozenset[str] = field(default=frozenset(), init=False, repr=False, compare=False)
 
     @property
-    def tags(self) -> set[str]:
-        return self.folder_tags | self.filename_tags
+    def tags(self) -> frozenset[str]:
+        return self._tags
 
     def __init__(self, filepath: str, filename: str,
-                 folder_tags: set[str] | None = None) -> None:
+                 folder_tags: set[str] | frozenset[str] | None = None,
+                 *, _normalised: bool = False) -> None:
         self.filepath = normalize_path(filepath)
         self.filename = filename
         self.composer = "Unknown"
         self.title = ""
-        self.folder_tags = set()
-        self.filename_tags = set()
+        if _normalised:
+            # Internal callers (scan_library, rename_score_tags) pass a
+            # frozenset already lowercased once per directory, shared as-is
+            # by every score in it.
+            self.folder_tags = folder_tags
+        else:
+            self.folder_tags = frozenset(t.lower() for t in folder_tags or () if t)
+        self.filename_tags = frozenset()
         self.content_hash = ""
         self.mtime = 0.0
-        if folder_tags:
-            self.folder_tags.update(t.lower() for t in folder_tags if t)
         self._parse()
 
     def _parse(self) -> None:
         try:
             base = os.path.splitext(self.filename)[0]
-            if " -- " in base:
-                parts = base.split(" -- ", 1)
-                base = parts[0]
-                self.filename_tags.update(
-                    t.lower() for t in parts[1].split() if t
+            base, sep, tag_str = base.partition(" -- ")
+            if sep:
+                # Interned so the same tag across thousands of scores is
+                # one string object.
+                self.filename_tags = frozenset(
+                    sys.intern(t.lower()) for t in tag_str.split()
                 )
-            if " - " in base:
-                parts = base.split(" - ", 1)
-                self.composer = parts[0].strip()
-                self.title = parts[1].strip()
+            composer, sep, title = base.partition(" - ")
+            if sep:
+                self.composer = composer.strip()
+                self.title = title.strip()
             else:
                 self.title = base.strip()
         except Exception as exc:
-            logging.warning(f"Could not parse filename '{self.filename}': {exc}")
+            logging.warning("Could not parse filename '%s': %s", self.filename, exc)
+        # Lowercased copies used by library search and sorting, computed once
+        # here rather than on every request.
+        self.title_lower = self.title.lower()
+        self.composer_lower = self.composer.lower()
+        # Both joined for text search, so a query is one substring test.
+        # NUL can't occur in a filename, so a real query never matches
+        # across the separator.
+        self.search_lower = f"{self.composer_lower}\0{self.title_lower}"
+        # Combined and sorted tags, likewise fixed once the filename is parsed;
+        # both tag sets are frozen so these can't go stale.
+        self._tags = self.folder_tags | self.filename_tags
+        self.sorted_tags = tuple(sorted(self._tags))
 
     def to_dict(self) -> dict:
         """Serialise to a JSON-friendly dict."""
@@ -210,7 +273,7 @@ class Score:
             "filename": self.filename,
             "composer": self.composer,
             "title": self.title,
-            "tags": sorted(self.tags),
+            "tags": list(self.sorted_tags),
             "folder_tags": sorted(self.folder_tags),
             "filename_tags": sorted(self.filename_tags),
             "content_hash": self.content_hash,
@@ -270,7 +333,7 @@ def rename_score_tags(score: Score, new_tags: set[str]) -> Score:
             os.rename(new_filepath, score.filepath)
             raise
 
-    new_score = Score(new_filepath, new_filename, score.folder_tags)
+    new_score = Score(new_filepath, new_filename, score.folder_tags, _normalised=True)
     new_score.content_hash = score.content_hash
     return new_score
 
@@ -280,6 +343,16 @@ def rename_score_tags(score: Score, new_tags: set[str]) -> Score:
 # ---------------------------------------------------------------------------
 
 
+def _is_exclude_marker(entry: os.DirEntry) -> bool:
+    if entry.name != ".exclude":
+        return False
+    try:
+        return entry.is_file(follow_symlinks=False)
+    except OSError:
+        # Unreadable marker: err on the side of skipping the directory
+        return True
+
+
 def scan_library(
     path: str,
     hash_cache: dict | None = None,
@@ -302,25 +375,25 @@ def scan_library(
     found: list[Score] = []
     new_cache: dict[str, dict] = {}
 
-    def visit(dir_path: str) -> None:
+    # Iterative depth-first walk (no recursion limit on deep trees). Subdirs
+    # are pushed in reverse so they are visited in scandir order, giving the
+    # same pre-order as a recursive walk.
+    stack = [path]
+    while stack:
+        dir_path = stack.pop()
         try:
             with os.scandir(dir_path) as it:
                 entries = list(it)
         except OSError:
-            return
+            continue
 
         # Skip directories that contain a .exclude marker
-        for e in entries:
-            if e.name == ".exclude":
-                try:
-                    if e.is_file(follow_symlinks=False):
-                        return
-                except OSError:
-                    return
+        if any(_is_exclude_marker(e) for e in entries):
+            continue
 
+        # Computed once per directory and shared by every Score in it
         rel = os.path.normpath(os.path.relpath(dir_path, path))
-        parts = rel.lower().replace("\\", "/").split("/")
-        ftags = {p for p in parts if p and p != "."}
+        ftags = frozenset(p for p in rel.lower().split(os.sep) if p and p != ".")
 
         subdirs: list[str] = []
         for entry in entries:
@@ -333,7 +406,7 @@ def scan_library(
             if not entry.name.lower().endswith(".pdf"):
                 continue
 
-            score = Score(entry.path, entry.name, ftags)
+            score = Score(entry.path, entry.name, ftags, _normalised=True)
 
             try:
                 st = entry.stat()
@@ -368,10 +441,7 @@ def scan_library(
 
             found.append(score)
 
-        for sd in subdirs:
-            visit(sd)
-
-    visit(path)
+        stack.extend(reversed(subdirs))
 
     if hash_cache is not None:
         hash_cache.clear()
@@ -385,12 +455,25 @@ def scan_library(
 # ---------------------------------------------------------------------------
 
 
+def _release_pdf_store(fitz) -> None:
+    """Empty MuPDF's global resource store after a document is closed.
+
+    The server process is long-lived and the store (fonts, images, parsed
+    objects) is shared across documents, so without this it keeps growing
+    with every PDF that gets counted or exported.
+    """
+    fitz.TOOLS.store_shrink(100)
+
+
 def pdf_page_count(filepath: str) -> int:
     """Return the number of pages in a PDF without rendering anything."""
     import pymupdf as fitz
 
-    with fitz.open(filepath) as doc:
-        return len(doc)
+    try:
+        with fitz.open(filepath) as doc:
+            return len(doc)
+    finally:
+        _release_pdf_store(fitz)
 
 
 # ---------------------------------------------------------------------------
@@ -493,7 +576,9 @@ def save_annotations(
         "rotations": clean_rot,
         "pages": pages,
     }
-    SafeJSON.save(sidecar, data)
+    # Ink points make these float-heavy and they are rewritten on every
+    # edit, so write them compact.
+    SafeJSON.save(sidecar, data, indent=None)
     return annotations_etag(pdf_path)
 
 
@@ -526,26 +611,29 @@ def export_annotated_pdf(pdf_path: str) -> bytes:
     pages = data.get("pages", {})
     rots = data.get("rotations", {})
 
-    with fitz.open(pdf_path) as doc:
-        for pg_str, annots in pages.items():
-            pg_num = int(pg_str)
-            if pg_num >= len(doc):
-                continue
-            page = doc[pg_num]
-            w = page.rect.width
-            h = page.rect.height
-
-            for a in annots:
-                if a.get("type") == "ink":
-                    _export_ink(page, a, w, h)
-                elif a.get("type") == "text":
-                    _export_text(page, a, w, h)
-
-            rot = rots.get(pg_str, 0) % 360
-            if rot:
-                page.set_rotation((page.rotation + rot) % 360)
-
-        return doc.tobytes()
+    try:
+        with fitz.open(pdf_path) as doc:
+            for pg_str, annots in pages.items():
+                pg_num = int(pg_str)
+                if pg_num >= len(doc):
+                    continue
+                page = doc[pg_num]
+                w = page.rect.width
+                h = page.rect.height
+
+                for a in annots:
+                    if a.get("type") == "ink":
+                        _export_ink(page, a, w, h)
+                    elif a.get("type") == "text":
+                        _export_text(page, a, w, h)
+
+                rot = rots.get(pg_str, 0) % 360
+                if rot:
+                    page.set_rotation((page.rotation + rot) % 360)
+
+            return doc.tobytes()
+    finally:
+        _release_pdf_store(fitz)
 
 
 def _export_ink(page, annot: dict, w: float, h: float) -> None:
@@ -102,6 +102,9 @@ DEFAULT_WEB_CONFIG: dict = {
 _MAX_SETLIST_NAME = 200
 _SETLIST_NAME_RE = re.compile(r'^[^/\\<>:"|?*\x00-\x1f]+$')
 
+# Characters stripped from user-supplied filename tags
+_TAG_CLEAN_RE = re.compile(r'[^\w-]')
+
 
 def _load_config() -> dict:
     try:
@@ -199,6 +202,34 @@ class AppState:
         self.library_dir: str = ""
         self.scores: list[Score] = []
 
+    @property
+    def scores(self) -> list[Score]:
+        return self._scores
+
+    @scores.setter
+    def scores(self, scores: list[Score]) -> None:
+        self._scores = scores
+        self.reindex()
+
+    def reindex(self) -> None:
+        """Rebuild the tag and path -> score-position indexes.
+
+        Call after replacing an entry of ``scores`` in place; assigning a new
+        list reindexes automatically.
+        """
+        index: dict[str, set[int]] = {}
+        paths: dict[str, int] = {}
+        for i, s in enumerate(self._scores):
+            for t in s.tags:
+                index.setdefault(t, set()).add(i)
+            paths[portable_path(s.filepath)] = i
+        self.tag_index = index
+        self.path_index = paths
+
+    def find_score(self, path: str) -> int | None:
+        """Position in ``scores`` of the score at *path*, or None."""
+        return self.path_index.get(portable_path(path))
+
     def set_library(self, path: str) -> None:
         path = normalize_path(path)
         self.library_dir = path
@@ -216,11 +247,13 @@ class AppState:
         except SafeJSONError as e:
             log.warning("Could not save scan cache: %s", e)
         _heal_references(self)
-        self.config["last_directory"] = portable_path(path)
-        _save_config(self.config)
-        log.info(
-            f"Library set to {path} — {len(self.scores)} scores found"
-        )
+        # Rescans re-run this with the same path; only write the config when
+        # the remembered directory actually changes.
+        last_directory = portable_path(path)
+        if self.config.get("last_directory") != last_directory:
+            self.config["last_directory"] = last_directory
+            _save_config(self.config)
+        log.info("Library set to %s — %d scores found", path, len(self.scores))
 
     def setlist_path(self) -> str:
         if self.library_dir:
@@ -339,7 +372,7 @@ if _last:
         try:
             state.set_library(_resolved)
         except Exception as e:
-            log.warning(f"Could not auto-load library {_resolved}: {e}")
+            log.warning("Could not auto-load library %s: %s", _resolved, e)
 
 # ---------------------------------------------------------------------------
 # FastAPI app
@@ -659,21 +692,15 @@ def update_score_tags(req: UpdateTagsRequest):
         raise HTTPException(status_code=400, detail="No library directory set")
     resolved = _validate_library_path(req.path)
 
-    # Find the score in our in-memory library
-    score = None
-    score_idx = None
-    for i, s in enumerate(state.scores):
-        if os.path.normpath(s.filepath) == os.path.normpath(resolved):
-            score = s
-            score_idx = i
-            break
-    if score is None:
+    score_idx = state.find_score(resolved)
+    if score_idx is None:
         raise HTTPException(status_code=404, detail="Score not found in library")
+    score = state.scores[score_idx]
 
     # Clean tags: lowercase, alphanumeric + hyphens only
     clean_tags = set()
     for t in req.filename_tags:
-        t = re.sub(r'[^\w-]', '', t.strip().lower())
+        t = _TAG_CLEAN_RE.sub('', t.strip().lower())
         if t:
             clean_tags.add(t)
 
@@ -686,6 +713,7 @@ def update_score_tags(req: UpdateTagsRequest):
 
     # Update in-memory library
     state.scores[score_idx] = new_score
+    state.reindex()
 
     # Update setlist references that point to the old path
     old_portable = portable_path(score.filepath)
@@ -737,35 +765,36 @@ def get_library(
     q_lower = q.lower()
     tag_set = {t.lower() for t in tag}
 
-    matches = [
-        s for s in state.scores
-        if (not q_lower or q_lower in s.title.lower() or q_lower in s.composer.lower())
-        and (not composer or s.composer == composer)
-        and tag_set.issubset(s.tags)
-    ]
+    # Single pass: collect matches and the context-sensitive filter values
+    # (composers ignore the composer filter, tags respect it).
+    # Required tags narrow the candidates through the tag index first, so
+    # only scores carrying every selected tag are visited.
+    if tag_set:
+        hits = set.intersection(*(state.tag_index.get(t, set()) for t in tag_set))
+        candidates = [state.scores[i] for i in sorted(hits)]
+    else:
+        candidates = state.scores
+
+    matches = []
+    all_composers: set[str] = set()
+    all_tags: set[str] = set()
+    for s in candidates:
+        if q_lower and q_lower not in s.search_lower:
+            continue
+        all_composers.add(s.composer)
+        if composer and s.composer != composer:
+            continue
+        all_tags.update(s.tags)
+        matches.append(s)
 
     key_map = {
-        "composer": lambda s: (s.composer.lower(), s.title.lower()),
-        "title": lambda s: (s.title.lower(), s.composer.lower()),
-        "tags": lambda s: (sorted(s.tags), s.composer.lower()),
+        "composer": lambda s: (s.composer_lower, s.title_lower),
+        "title": lambda s: (s.title_lower, s.composer_lower),
+        "tags": lambda s: (s.sorted_tags, s.composer_lower),
     }
     if sort in key_map:
         matches.sort(key=key_map[sort], reverse=desc)
 
-    # Gather available filter values (context-sensitive)
-    all_composers: set[str] = set()
-    all_tags: set[str] = set()
-    for s in state.scores:
-        title_match = (
-            not q_lower
-            or q_lower in s.title.lower()
-            or q_lower in s.composer.lower()
-        )
-        if title_match and tag_set.issubset(s.tags):
-            all_composers.add(s.composer)
-        if title_match and (not composer or s.composer == composer) and tag_set.issubset(s.tags):
-            all_tags.update(s.tags)
-
     return {
         "scores": [s.to_dict() for s in matches],
         "total": len(matches),
@@ -898,11 +927,10 @@ def get_recent():
     path) rather than stored in the recent file, so renamed/retagged scores
     stay accurate. Entries no longer in the library get an empty tag list.
     """
-    by_path = {portable_path(s.filepath): s for s in state.scores}
     recent = _load_recent()
     for entry in recent:
-        score = by_path.get(entry.get("filepath"))
-        entry["tags"] = sorted(score.tags) if score else []
+        idx = state.path_index.get(entry.get("filepath"))
+        entry["tags"] = list(state.scores[idx].sorted_tags) if idx is not None else []
     return {"recent": recent}
 
 
@@ -929,13 +957,10 @@ def add_recent(req: AddRecentRequest):
         raise HTTPException(status_code=400, detail="No library directory set")
     resolved = _validate_library_path(req.path)
     pkey = portable_path(resolved)
-    score = next(
-        (s for s in state.scores
-         if portable_path(s.filepath) == pkey),
-        None,
-    )
-    if score is None:
+    idx = state.find_score(resolved)
+    if idx is None:
         raise HTTPException(status_code=404, detail="Score not in library")
+    score = state.scores[idx]
     data = _load_recent()
     data = [e for e in data if e.get("filepath") != pkey]
     data.insert(0, {
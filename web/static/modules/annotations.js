@@ -10,7 +10,8 @@ import {
 } from "./dom.js";
 import { api } from "./api.js";
 import {
-  MUSICAL_SYMBOLS, UNDO_DEPTH, transformPt, inverseTransformPt, esc,
+  UNDO_DEPTH, transformPt, transformMatrix, inverseTransformPt, esc,
+  simplifyStroke, textAnnotSize,
 } from "./utils.js";
 
 // Callbacks registered by dialog-handlers to avoid circular deps
@@ -24,19 +25,53 @@ export function setTextDialogHandler(fn) { _textDialogHandler = fn; }
 // Drawing
 // ---------------------------------------------------------------------------
 
+// Committed annotations are drawn into an off-screen buffer per page slot
+// and blitted to the visible overlay. The overlay also carries the live pen
+// segments; finishing a stroke then only needs that one stroke drawn into
+// the buffer and a single blit (which also wipes the live segments),
+// rather than a full repaint of every annotation on the page.
+const _annotBuffers = [null, null];
+
+function annotBuffer(i, annotCanvas) {
+  let buf = _annotBuffers[i];
+  if (!buf) buf = _annotBuffers[i] = document.createElement("canvas");
+  if (buf.width !== annotCanvas.width) buf.width = annotCanvas.width;
+  if (buf.height !== annotCanvas.height) buf.height = annotCanvas.height;
+  return buf;
+}
+
+function blitBuffer(annotCanvas, buf) {
+  const ctx = annotCanvas.getContext("2d");
+  ctx.setTransform(1, 0, 0, 1, 0, 0);
+  ctx.clearRect(0, 0, annotCanvas.width, annotCanvas.height);
+  ctx.drawImage(buf, 0, 0);
+}
+
 export function drawAnnotations() {
   const s = getState();
   for (let i = 0; i < s.pageLayouts.length; i++) {
     const layout = s.pageLayouts[i];
     const ac = i === 0 ? annotCanvas1 : annotCanvas2;
-    drawPageAnnotations(ac, layout);
+    drawPageAnnotations(ac, layout, i);
+  }
+}
+
+// Redraw only the slot(s) showing page *pg* — edits touch one page, so
+// the other half of a two-page spread needn't be repainted.
+function drawAnnotationsForPage(pg) {
+  const s = getState();
+  for (let i = 0; i < s.pageLayouts.length; i++) {
+    const layout = s.pageLayouts[i];
+    if (String(layout.page - 1) !== pg) continue;
+    drawPageAnnotations(i === 0 ? annotCanvas1 : annotCanvas2, layout, i);
   }
 }
 
-function drawPageAnnotations(annotCanvas, layout) {
+function drawPageAnnotations(annotCanvas, layout, i) {
   const s = getState();
   const dpr = window.devicePixelRatio || 1;
-  const ctx = annotCanvas.getContext("2d");
+  const buf = annotBuffer(i, annotCanvas);
+  const ctx = buf.getContext("2d");
   ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
   ctx.clearRect(0, 0, layout.cssW, layout.cssH);
 
@@ -44,26 +79,60 @@ function drawPageAnnotations(annotCanvas, layout) {
   const pageAnnots = s.annotations[pg] || [];
   const rot = (s.rotations[pg] || 0) % 360;
 
+  // Last font string assigned on this pass. Setting ctx.font re-parses the
+  // CSS font shorthand even when it is unchanged, and most text on a page
+  // shares one font, so only assign on a change.
+  const fontState = { font: null };
   for (const annot of pageAnnots) {
     if (annot.type === "ink") {
       drawInk(ctx, annot, layout.cssW, layout.cssH, rot);
     } else if (annot.type === "text") {
-      drawText(ctx, annot, layout.cssW, layout.cssH, rot);
+      drawText(ctx, annot, layout.cssW, layout.cssH, rot, fontState);
     }
   }
+  blitBuffer(annotCanvas, buf);
+}
+
+// Draw one newly added annotation (topmost, so z-order is unaffected) on
+// top of the buffered page. Falls back to a full redraw if the page isn't
+// in a known slot or the buffer no longer matches the overlay, e.g. after
+// a resize.
+function drawAddedAnnotation(layoutIndex, annot) {
+  const s = getState();
+  const layout = s.pageLayouts[layoutIndex];
+  const ac = layoutIndex === 0 ? annotCanvas1 : annotCanvas2;
+  const buf = _annotBuffers[layoutIndex];
+  if (!layout || !buf || buf.width !== ac.width || buf.height !== ac.height) {
+    drawAnnotations();
+    return;
+  }
+  const dpr = window.devicePixelRatio || 1;
+  const ctx = buf.getContext("2d");
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  const rot = (s.rotations[String(layout.page - 1)] || 0) % 360;
+  if (annot.type === "ink") {
+    drawInk(ctx, annot, layout.cssW, layout.cssH, rot);
+  } else if (annot.type === "text") {
+    drawText(ctx, annot, layout.cssW, layout.cssH, rot, { font: null });
+  }
+  blitBuffer(ac, buf);
 }
 
 function drawInk(ctx, annot, w, h, rot) {
   const pts = annot.points;
   if (!pts || pts.length < 2) return;
 
+  // Build the path in normalized coords under the page transform; the
+  // context maps each point as it is added. Restore before stroking so
+  // lineWidth is still in CSS pixels rather than scaled by w/h.
+  ctx.save();
+  ctx.transform(...transformMatrix(w, h, rot));
   ctx.beginPath();
-  const [x0, y0] = transformPt(pts[0][0], pts[0][1], w, h, rot);
-  ctx.moveTo(x0, y0);
+  ctx.moveTo(pts[0][0], pts[0][1]);
   for (let i = 1; i < pts.length; i++) {
-    const [x, y] = transformPt(pts[i][0], pts[i][1], w, h, rot);
-    ctx.lineTo(x, y);
+    ctx.lineTo(pts[i][0], pts[i][1]);
   }
+  ctx.restore();
   ctx.strokeStyle = annot.color || "black";
   ctx.lineWidth = annot.width || 2;
   ctx.lineCap = "round";
@@ -71,14 +140,14 @@ function drawInk(ctx, annot, w, h, rot) {
   ctx.stroke();
 }
 
-function drawText(ctx, annot, w, h, rot) {
+function drawText(ctx, annot, w, h, rot, fontState) {
   const [cx, cy] = transformPt(annot.x, annot.y, w, h, rot);
-  let sz = 12 + (annot.size || 2) * 4;
-  if (MUSICAL_SYMBOLS.has(annot.text)) {
-    sz = Math.round(sz * 6);
+  const sz = textAnnotSize(annot);
+  const font = `${sz}px ${annot.font || "sans-serif"}`;
+  if (fontState.font !== font) {
+    ctx.font = font;
+    fontState.font = font;
   }
-  const font = annot.font || "sans-serif";
-  ctx.font = `${sz}px ${font}`;
   ctx.fillStyle = annot.color || "black";
   ctx.textAlign = "center";
   ctx.textBaseline = "middle";
@@ -107,10 +176,14 @@ export function setTool(tool) {
 // Undo
 // ---------------------------------------------------------------------------
 
+// Snapshots are shallow copies of the page's annotation list: annotation
+// objects are never mutated once they are on a page. Edits (move, text
+// edit) swap in a modified copy instead, so a snapshot can share every
+// object with the live list and with other snapshots.
 function pushUndo(pg) {
   const s = getState();
   if (!s.undoStacks[pg]) s.undoStacks[pg] = [];
-  const snapshot = JSON.parse(JSON.stringify(s.annotations[pg] || []));
+  const snapshot = (s.annotations[pg] || []).slice();
   s.undoStacks[pg].push(snapshot);
   if (s.undoStacks[pg].length > UNDO_DEPTH) {
     s.undoStacks[pg].shift();
@@ -124,7 +197,7 @@ export function doUndo() {
   if (!stack || stack.length === 0) return;
   s.annotations[pg] = stack.pop();
   saveAnnotations();
-  drawAnnotations();
+  drawAnnotationsForPage(pg);
 }
 
 // ---------------------------------------------------------------------------
@@ -140,7 +213,7 @@ export function clearCurrentPageAnnotations() {
   pushUndo(pg);
   s.annotations[pg] = [];
   saveAnnotations();
-  drawAnnotations();
+  drawAnnotationsForPage(pg);
   return true;
 }
 
@@ -195,12 +268,25 @@ export function rotatePage(delta) {
 // preventing false etag conflicts from concurrent in-flight requests.
 let _saveChain = Promise.resolve();
 
+// A save that is queued behind the in-flight one but hasn't started yet.
+// Every PUT sends the whole annotation set, so further edits made while it
+// waits just ride along with it instead of queueing a PUT each — a burst of
+// strokes during a slow request costs one follow-up write, not N.
+let _queuedSave = null;
+
 export function saveAnnotations(force = false) {
   const filepath = getState().currentScore?.filepath;
+  if (_queuedSave && _queuedSave.filepath === filepath) {
+    _queuedSave.force = _queuedSave.force || force;
+    return;
+  }
+  const queued = { filepath, force };
+  _queuedSave = queued;
   _saveChain = _saveChain.then(() => {
+    if (_queuedSave === queued) _queuedSave = null;
     const s = getState();
     if (!s.currentScore || s.currentScore.filepath !== filepath) return;
-    return _doSaveAnnotations(s, force);
+    return _doSaveAnnotations(s, queued.force);
   }).catch((err) => {
     console.error("Save chain error:", err);
   });
@@ -237,9 +323,15 @@ async function _doSaveAnnotations(s, force) {
 // Pointer events
 // ---------------------------------------------------------------------------
 
+// Pointer position in the canvas's own CSS pixels (the layout.cssW/cssH
+// space). getBoundingClientRect includes CSS transforms, so while the
+// viewer's resize preview scales the page wrap the offset is divided back
+// by that scale; offsetWidth/Height are the untransformed layout size.
 function canvasCoords(e, annotCanvas) {
   const rect = annotCanvas.getBoundingClientRect();
-  return { x: e.clientX - rect.left, y: e.clientY - rect.top };
+  const kx = rect.width ? annotCanvas.offsetWidth / rect.width : 1;
+  const ky = rect.height ? annotCanvas.offsetHeight / rect.height : 1;
+  return { x: (e.clientX - rect.left) * kx, y: (e.clientY - rect.top) * ky };
 }
 
 // Navigation callbacks — set by viewer module to avoid circular dep
@@ -282,9 +374,12 @@ function onPointerDown(e, annotCanvas, layoutIndex) {
 
   if (s.activeTool === "pen") {
     const { x, y } = canvasCoords(e, annotCanvas);
-    s.currentStroke = [{ x, y }];
+    // Flat [x0, y0, x1, y1, ...] in CSS px — no per-sample object
+    s.currentStroke = [x, y];
+    _liveDrawn = 0;
     annotCanvas.setPointerCapture(e.pointerId);
   } else if (s.activeTool === "eraser") {
+    _eraseGesturePages = new Set();
     eraseAt(e, annotCanvas, layoutIndex);
     annotCanvas.setPointerCapture(e.pointerId);
   } else if (s.activeTool === "move") {
@@ -296,25 +391,45 @@ function onPointerDown(e, annotCanvas, layoutIndex) {
   }
 }
 
+// The live stroke is drawn at most once per animation frame as one path
+// through every point received since the last frame, rather than one
+// beginPath/stroke per pointermove — pens report faster than the display
+// refreshes. _liveDrawn is the offset in currentStroke of the last point
+// already on screen.
+let _liveDrawn = 0;
+let _liveFrame = null;
+
+function drawLiveStroke(annotCanvas) {
+  _liveFrame = null;
+  const s = getState();
+  const pts = s.currentStroke;
+  if (pts.length - _liveDrawn < 4) return;
+
+  const dpr = window.devicePixelRatio || 1;
+  const ctx = annotCanvas.getContext("2d");
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.beginPath();
+  ctx.moveTo(pts[_liveDrawn], pts[_liveDrawn + 1]);
+  for (let i = _liveDrawn + 2; i < pts.length; i += 2) {
+    ctx.lineTo(pts[i], pts[i + 1]);
+  }
+  ctx.strokeStyle = s.penColor;
+  ctx.lineWidth = parseInt(sizeSlider.value, 10);
+  ctx.lineCap = "round";
+  ctx.lineJoin = "round";
+  ctx.stroke();
+  _liveDrawn = pts.length - 2;
+}
+
 function onPointerMove(e, annotCanvas, layoutIndex) {
   const s = getState();
   if (s.activeTool === "pen" && s.currentStroke.length > 0) {
     e.preventDefault();
     const { x, y } = canvasCoords(e, annotCanvas);
-    s.currentStroke.push({ x, y });
-
-    const dpr = window.devicePixelRatio || 1;
-    const ctx = annotCanvas.getContext("2d");
-    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
-    const prev = s.currentStroke[s.currentStroke.length - 2];
-    ctx.beginPath();
-    ctx.moveTo(prev.x, prev.y);
-    ctx.lineTo(x, y);
-    ctx.strokeStyle = s.penColor;
-    ctx.lineWidth = parseInt(sizeSlider.value, 10);
-    ctx.lineCap = "round";
-    ctx.lineJoin = "round";
-    ctx.stroke();
+    s.currentStroke.push(x, y);
+    if (_liveFrame === null) {
+      _liveFrame = requestAnimationFrame(() => drawLiveStroke(annotCanvas));
+    }
   } else if (s.activeTool === "eraser" && e.buttons > 0) {
     e.preventDefault();
     eraseAt(e, annotCanvas, layoutIndex);
@@ -326,33 +441,39 @@ function onPointerMove(e, annotCanvas, layoutIndex) {
 
 function onPointerUp(e, annotCanvas, layoutIndex) {
   const s = getState();
-  if (s.activeTool === "pen" && s.currentStroke.length > 1) {
+  if (_liveFrame !== null) {
+    cancelAnimationFrame(_liveFrame);
+    _liveFrame = null;
+  }
+  if (s.activeTool === "pen" && s.currentStroke.length > 2) {
     const layout = s.pageLayouts[layoutIndex];
     if (!layout) { s.currentStroke = []; return; }
 
     const pg = String(layout.page - 1);
     const rot = (s.rotations[pg] || 0) % 360;
 
-    const norm = s.currentStroke.map(({ x, y }) => {
-      const nx = x / layout.cssW;
-      const ny = y / layout.cssH;
-      return inverseTransformPt(nx, ny, rot);
-    });
+    const pts = simplifyStroke(s.currentStroke);
+    const norm = [];
+    for (let i = 0; i < pts.length; i += 2) {
+      norm.push(inverseTransformPt(pts[i] / layout.cssW, pts[i + 1] / layout.cssH, rot));
+    }
 
     pushUndo(pg);
     if (!s.annotations[pg]) s.annotations[pg] = [];
-    s.annotations[pg].push({
+    const annot = {
       uuid: crypto.randomUUID(),
       type: "ink",
       points: norm,
       color: s.penColor,
       width: parseInt(sizeSlider.value, 10),
-    });
+    };
+    s.annotations[pg].push(annot);
     saveAnnotations();
-    drawAnnotations();
+    drawAddedAnnotation(layoutIndex, annot);
   } else if (s.activeTool === "move" && s.draggingAnnot) {
     endMove();
   }
+  _eraseGesturePages = null;
   s.currentStroke = [];
 }
 
@@ -360,6 +481,10 @@ function onPointerUp(e, annotCanvas, layoutIndex) {
 // Eraser
 // ---------------------------------------------------------------------------
 
+// Pages that already have an undo snapshot for the current eraser drag.
+// One drag through several strokes is one undo step, not one per stroke.
+let _eraseGesturePages = null;
+
 function eraseAt(e, annotCanvas, layoutIndex) {
   const s = getState();
   const layout = s.pageLayouts[layoutIndex];
@@ -375,27 +500,57 @@ function eraseAt(e, annotCanvas, layoutIndex) {
 
   for (let i = pageAnnots.length - 1; i >= 0; i--) {
     if (hitTest(pageAnnots[i], x, y, layout.cssW, layout.cssH, rot, halo)) {
-      pushUndo(pg);
+      if (!_eraseGesturePages?.has(pg)) {
+        pushUndo(pg);
+        _eraseGesturePages?.add(pg);
+      }
       pageAnnots.splice(i, 1);
       saveAnnotations();
-      drawAnnotations();
+      drawAnnotationsForPage(pg);
       return;
     }
   }
 }
 
+// Bounding box of an ink stroke in stored (normalized) coords, keyed by the
+// points array. Strokes are never mutated in place — move and undo assign a
+// fresh array — so an entry can't go stale.
+const _inkBounds = new WeakMap();
+
+function inkBounds(points) {
+  let b = _inkBounds.get(points);
+  if (!b) {
+    let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+    for (const [x, y] of points) {
+      if (x < x0) x0 = x;
+      if (x > x1) x1 = x;
+      if (y < y0) y0 = y;
+      if (y > y1) y1 = y;
+    }
+    b = [x0, y0, x1, y1];
+    _inkBounds.set(points, b);
+  }
+  return b;
+}
+
 function hitTest(annot, px, py, w, h, rot, halo) {
   if (annot.type === "ink") {
+    // Test in stored coords: map the pointer back once instead of every
+    // point forward. Rotations are quarter turns, so the halo box stays
+    // axis-aligned; 90/270 just swap which page dimension scales each axis.
+    const [qx, qy] = inverseTransformPt(px / w, py / h, rot);
+    const swap = rot === 90 || rot === 270;
+    const hx = halo / (swap ? h : w);
+    const hy = halo / (swap ? w : h);
+    const [x0, y0, x1, y1] = inkBounds(annot.points);
+    if (qx <= x0 - hx || qx >= x1 + hx || qy <= y0 - hy || qy >= y1 + hy) return false;
     for (const pt of annot.points) {
-      const [cx, cy] = transformPt(pt[0], pt[1], w, h, rot);
-      if (Math.abs(cx - px) < halo && Math.abs(cy - py) < halo) return true;
+      if (Math.abs(pt[0] - qx) < hx && Math.abs(pt[1] - qy) < hy) return true;
     }
     return false;
   } else if (annot.type === "text") {
     const [cx, cy] = transformPt(annot.x, annot.y, w, h, rot);
-    let sz = 12 + (annot.size || 2) * 4;
-    if (MUSICAL_SYMBOLS.has(annot.text)) sz = Math.round(sz * 6);
-    const textHalo = Math.max(halo, sz);
+    const textHalo = Math.max(halo, textAnnotSize(annot));
     return Math.abs(cx - px) < textHalo && Math.abs(cy - py) < textHalo;
   }
   return false;
@@ -421,9 +576,11 @@ function startMove(e, annotCanvas, layoutIndex) {
   const halo = 20;
 
   let target = null;
+  let targetIdx = -1;
   for (let i = pageAnnots.length - 1; i >= 0; i--) {
     if (hitTest(pageAnnots[i], x, y, layout.cssW, layout.cssH, rot, halo)) {
       target = pageAnnots[i];
+      targetIdx = i;
       break;
     }
   }
@@ -441,6 +598,7 @@ function startMove(e, annotCanvas, layoutIndex) {
   s.draggingAnnot = {
     pg,
     uuid: target.uuid,
+    idx: targetIdx,
     grabX,
     grabY,
     rot,
@@ -457,9 +615,15 @@ function moveTo(e, annotCanvas) {
   const d = s.draggingAnnot;
   if (!d) return;
 
+  // The dragged annotation's position in the page list is remembered
+  // between moves; fall back to a uuid search if the list has changed.
   const pageAnnots = s.annotations[d.pg] || [];
-  const annot = pageAnnots.find((a) => a.uuid === d.uuid);
-  if (!annot) return;
+  if (pageAnnots[d.idx]?.uuid !== d.uuid) {
+    d.idx = pageAnnots.findIndex((a) => a.uuid === d.uuid);
+    if (d.idx < 0) return;
+  }
+  const idx = d.idx;
+  let annot = pageAnnots[idx];
 
   const { x, y } = canvasCoords(e, annotCanvas);
   const [curX, curY] = inverseTransformPt(x / d.cssW, y / d.cssH, d.rot);
@@ -468,9 +632,12 @@ function moveTo(e, annotCanvas) {
 
   // Snapshot for undo only once an actual drag begins, so a stray tap on
   // an annotation doesn't pollute the undo stack.
+  // The undo snapshot shares the original object, so the drag works on a
+  // copy swapped into the live list.
   if (!d.moved) {
     pushUndo(d.pg);
     d.moved = true;
+    annot = pageAnnots[idx] = { ...annot };
   }
 
   if (annot.type === "ink") {
@@ -479,7 +646,7 @@ function moveTo(e, annotCanvas) {
     annot.x = d.orig.x + dx;
     annot.y = d.orig.y + dy;
   }
-  drawAnnotations();
+  drawAnnotationsForPage(d.pg);
 }
 
 function endMove() {
@@ -487,7 +654,7 @@ function endMove() {
   const d = s.draggingAnnot;
   s.draggingAnnot = null;
   if (d && d.moved) saveAnnotations();
-  drawAnnotations();
+  if (d) drawAnnotationsForPage(d.pg);
 }
 
 // ---------------------------------------------------------------------------
@@ -537,29 +704,35 @@ export function commitTextAnnotation(text, font) {
 
   if (editUuid) {
     const pageAnnots = s.annotations[pg] || [];
-    const existing = pageAnnots.find((a) => a.uuid === editUuid);
-    if (existing) {
-      existing.text = text;
-      existing.font = font;
-      existing.color = s.penColor;
-      existing.size = parseInt(sizeSlider.value, 10);
+    const idx = pageAnnots.findIndex((a) => a.uuid === editUuid);
+    if (idx >= 0) {
+      pageAnnots[idx] = {
+        ...pageAnnots[idx],
+        text,
+        font,
+        color: s.penColor,
+        size: parseInt(sizeSlider.value, 10),
+      };
     }
-  } else {
-    if (!s.annotations[pg]) s.annotations[pg] = [];
-    s.annotations[pg].push({
-      uuid: crypto.randomUUID(),
-      type: "text",
-      x: nx,
-      y: ny,
-      text,
-      font,
-      color: s.penColor,
-      size: parseInt(sizeSlider.value, 10),
-    });
+    saveAnnotations();
+    drawAnnotationsForPage(pg);
+    return;
   }
 
+  if (!s.annotations[pg]) s.annotations[pg] = [];
+  const annot = {
+    uuid: crypto.randomUUID(),
+    type: "text",
+    x: nx,
+    y: ny,
+    text,
+    font,
+    color: s.penColor,
+    size: parseInt(sizeSlider.value, 10),
+  };
+  s.annotations[pg].push(annot);
   saveAnnotations();
-  drawAnnotations();
+  drawAddedAnnotation(s.pageLayouts.findIndex((l) => String(l.page - 1) === pg), annot);
 }
 
 export function cancelTextAnnotation() {
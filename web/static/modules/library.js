@@ -18,6 +18,10 @@ import { CACHE_AVAILABLE, isCached, toggleCache, refreshCacheStatus } from "./ca
 // ---------------------------------------------------------------------------
 
 let _loadGen = 0;
+// Search text of the most recent successful load, so keystrokes that leave
+// the trimmed query unchanged (spaces, arrows, type-then-delete) don't
+// refetch. Only set on success, so retyping after a failed load retries.
+let _lastQuery = "";
 
 export async function loadLibrary() {
   const gen = ++_loadGen;
@@ -36,6 +40,7 @@ export async function loadLibrary() {
   try {
     const data = await api(`/api/library?${params}`);
     if (gen !== _loadGen) return;
+    _lastQuery = q;
     s.scores = data.scores;
     s.composers = data.composers;
     s.tags = data.tags;
@@ -50,31 +55,50 @@ export async function loadLibrary() {
   }
 }
 
-function renderLibrary() {
-  const s = getState();
-  libraryBody.innerHTML = "";
-  for (const sc of s.scores) {
-    const tr = document.createElement("tr");
-    tr.dataset.filepath = sc.filepath;
-    const cached = isCached(sc.filepath);
-    tr.innerHTML = `
+// Rendered rows by filepath, reused across reloads while the score's
+// displayed fields are unchanged — re-sorting, toggling a tag or refining
+// a search mostly re-shows the same rows, so only newly visible scores pay
+// for building a row. Holds only the rows currently shown (renderLibrary
+// prunes the rest), so detached rows from earlier results or a previous
+// library directory are not kept alive. Cache buttons on reused rows are
+// brought up to date by refreshCacheStatus after each load.
+const _rowCache = new Map();
+
+function libraryRow(sc) {
+  const tags = sc.tags.join(", ");
+  const key = `${sc.composer}\0${sc.title}\0${tags}`;
+  const hit = _rowCache.get(sc.filepath);
+  if (hit && hit.key === key) return hit.tr;
+
+  const tr = document.createElement("tr");
+  tr.dataset.filepath = sc.filepath;
+  const cached = isCached(sc.filepath);
+  tr.innerHTML = `
       <td title="${esc(sc.composer)}">${esc(sc.composer)}</td>
       <td title="${esc(sc.title)}">${esc(sc.title)}</td>
-      <td title="${esc(sc.tags.join(", "))}">${esc(sc.tags.join(", "))}</td>
+      <td title="${esc(tags)}">${esc(tags)}</td>
       ${CACHE_AVAILABLE ? `<td class="cache-col"><button class="cache-btn small-btn${cached ? " cached" : ""}" title="${cached ? "Remove from offline cache" : "Download for offline use"}">${cached ? "\u2713" : "\u2B07"}</button></td>` : ""}
     `;
-    tr.addEventListener("click", (e) => {
-      if (e.target.closest(".cache-btn")) return;
-      openScore(sc);
-    });
-    const cacheBtn = tr.querySelector(".cache-btn");
-    if (cacheBtn) {
-      cacheBtn.addEventListener("click", (e) => {
-        e.stopPropagation();
-        toggleCache(sc.filepath, e.target);
-      });
-    }
-    libraryBody.appendChild(tr);
+  _rowCache.set(sc.filepath, { key, tr });
+  return tr;
+}
+
+function renderLibrary() {
+  const s = getState();
+  // Build every row off-document and swap them in with one DOM
+  // operation; clicks are handled by a single delegated listener on
+  // libraryBody (see initLibraryEvents) rather than two per row.
+  const frag = document.createDocumentFragment();
+  const shown = new Set();
+  s.scores.forEach((sc, i) => {
+    const tr = libraryRow(sc);
+    tr.dataset.index = i;
+    frag.appendChild(tr);
+    shown.add(sc.filepath);
+  });
+  libraryBody.replaceChildren(frag);
+  for (const fp of _rowCache.keys()) {
+    if (!shown.has(fp)) _rowCache.delete(fp);
   }
 }
 
@@ -91,23 +115,31 @@ function renderComposerFilter() {
   }
 }
 
+// Tag list the chips in tagBar were last built from. Most reloads (search
+// keystrokes, toggling a chip) leave it unchanged, in which case only the
+// chips' selected state is updated instead of rebuilding the bar.
+let _renderedTags = [];
+
 function renderTags() {
   const s = getState();
-  tagBar.innerHTML = "";
+  const same = s.tags.length === _renderedTags.length
+    && s.tags.every((t, i) => t === _renderedTags[i]);
+  if (same) {
+    for (const chip of tagBar.children) {
+      chip.classList.toggle("selected", s.selectedTags.has(chip.dataset.tag));
+    }
+    return;
+  }
+  _renderedTags = s.tags;
+  const frag = document.createDocumentFragment();
   for (const t of s.tags) {
     const chip = document.createElement("span");
     chip.className = "tag-chip" + (s.selectedTags.has(t) ? " selected" : "");
+    chip.dataset.tag = t;
     chip.textContent = t;
-    chip.addEventListener("click", () => {
-      if (s.selectedTags.has(t)) {
-        s.selectedTags.delete(t);
-      } else {
-        s.selectedTags.add(t);
-      }
-      loadLibrary();
-    });
-    tagBar.appendChild(chip);
+    frag.appendChild(chip);
   }
+  tagBar.replaceChildren(frag);
 }
 
 // ---------------------------------------------------------------------------
@@ -138,6 +170,33 @@ let _loadSetlists = null;
 export function setLoadSetlistsFn(fn) { _loadSetlists = fn; }
 
 export function initLibraryEvents() {
+  libraryBody.addEventListener("click", (e) => {
+    const tr = e.target.closest("tr");
+    if (!tr || !libraryBody.contains(tr)) return;
+    const sc = getState().scores[Number(tr.dataset.index)];
+    if (!sc) return;
+    const cacheBtn = e.target.closest(".cache-btn");
+    if (cacheBtn) {
+      e.stopPropagation();
+      toggleCache(sc.filepath, cacheBtn);
+      return;
+    }
+    openScore(sc);
+  });
+
+  tagBar.addEventListener("click", (e) => {
+    const chip = e.target.closest(".tag-chip");
+    if (!chip) return;
+    const s = getState();
+    const t = chip.dataset.tag;
+    if (s.selectedTags.has(t)) {
+      s.selectedTags.delete(t);
+    } else {
+      s.selectedTags.add(t);
+    }
+    loadLibrary();
+  });
+
   document.querySelectorAll("th.sortable").forEach((th) => {
     th.addEventListener("click", () => {
       const s = getState();
@@ -155,7 +214,8 @@ export function initLibraryEvents() {
 
   let searchTimer = null;
   searchInput.addEventListener("input", () => {
-    if (searchTimer) clearTimeout(searchTimer);
+    if (searchTimer) { clearTimeout(searchTimer); searchTimer = null; }
+    if (searchInput.value.trim() === _lastQuery) return;
     searchTimer = setTimeout(loadLibrary, 200);
   });
 
@@ -304,28 +304,33 @@ export async function addCurrentScoreToSetlist(setlistName, startPage, endPage)
 // Song picker
 // ---------------------------------------------------------------------------
 
+// Scores behind the rows currently in songPickerList, indexed by the rows'
+// data-index; clicks are handled by one delegated listener (see
+// initSetlistEvents). _songPickerGen drops responses that arrive after a
+// newer search has been issued.
+let _songPickerScores = [];
+let _songPickerGen = 0;
+
 async function renderSongPicker(query) {
+  const gen = ++_songPickerGen;
   const params = new URLSearchParams();
   if (query) params.set("q", query);
   try {
     const data = await api(`/api/library?${params}`);
-    songPickerList.innerHTML = "";
-    const s = getState();
-    for (const sc of data.scores) {
+    if (gen !== _songPickerGen) return;
+    const frag = document.createDocumentFragment();
+    data.scores.forEach((sc, i) => {
       const div = document.createElement("div");
       div.className = "picker-item";
+      div.dataset.index = i;
       div.textContent = `${sc.composer} \u2014 ${sc.title}`;
-      div.addEventListener("click", () => {
-        songPickerList.querySelectorAll(".picker-item").forEach(
-          (el) => el.classList.remove("selected")
-        );
-        div.classList.add("selected");
-        s.pickerSelectedScore = sc;
-        songPickerAdd.disabled = false;
-      });
-      songPickerList.appendChild(div);
-    }
+      frag.appendChild(div);
+    });
+    _songPickerScores = data.scores;
+    songPickerList.replaceChildren(frag);
   } catch (err) {
+    if (gen !== _songPickerGen) return;
+    _songPickerScores = [];
     songPickerList.innerHTML = `<p style="color:#f88">Error loading library</p>`;
   }
 }
@@ -426,6 +431,18 @@ export function initSetlistEvents() {
     songSearch.focus();
   });
 
+  songPickerList.addEventListener("click", (e) => {
+    const div = e.target.closest(".picker-item");
+    if (!div) return;
+    const sc = _songPickerScores[Number(div.dataset.index)];
+    if (!sc) return;
+    const prev = songPickerList.querySelector(".picker-item.selected");
+    if (prev) prev.classList.remove("selected");
+    div.classList.add("selected");
+    s.pickerSelectedScore = sc;
+    songPickerAdd.disabled = false;
+  });
+
   let songSearchTimer = null;
   songSearch.addEventListener("input", () => {
     if (songSearchTimer) clearTimeout(songSearchTimer);
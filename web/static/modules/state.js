@@ -25,6 +25,7 @@ const state = {
   rendering: false,
   pageLayouts: [],
   cachedPages: new Map(),
+  renderedBitmaps: new Map(),
   scrollToBottomAfterRender: false,
 
   // Annotations
@@ -61,6 +62,11 @@ export function getState() {
   return state;
 }
 
+function clearRenderedBitmaps() {
+  for (const bmp of state.renderedBitmaps.values()) bmp.close();
+  state.renderedBitmaps.clear();
+}
+
 // Reset all viewer/annotation state when closing a score
 export function resetViewerState() {
   state.pdfDoc = null;
@@ -77,6 +83,7 @@ export function resetViewerState() {
   state.pendingTextAnnot = null;
   state.draggingAnnot = null;
   state.cachedPages.clear();
+  clearRenderedBitmaps();
 }
 
 // Reset annotation state when loading a new score (keeps viewer state)
@@ -86,5 +93,6 @@ export function resetAnnotationState() {
   state.annotationEtag = null;
   state.undoStacks = {};
   state.cachedPages.clear();
+  clearRenderedBitmaps();
   state.userLockedMode = false;
 }
@@ -10,6 +10,14 @@ export const MUSICAL_SYMBOLS = new Set([
   "sfz", "cresc", "dim",
 ]);
 
+// Font size in CSS px for a text annotation. Musical symbols are drawn 6x,
+// as glyphs like ♩ are tiny at text sizes. Shared by drawing and
+// hit-testing so the two can't drift apart.
+export function textAnnotSize(annot) {
+  const sz = 12 + (annot.size || 2) * 4;
+  return MUSICAL_SYMBOLS.has(annot.text) ? Math.round(sz * 6) : sz;
+}
+
 export function esc(s) {
   const d = document.createElement("div");
   d.textContent = s;
@@ -25,6 +33,15 @@ export function transformPt(nx, ny, w, h, rot) {
   return [nx * w, ny * h];
 }
 
+// transformPt as a canvas affine [a, b, c, d, e, f] (ctx.transform order),
+// so a whole stroke can be mapped by the context instead of point by point.
+export function transformMatrix(w, h, rot) {
+  if (rot === 90)  return [0, -h, w, 0, 0, h];
+  if (rot === 180) return [-w, 0, 0, -h, w, h];
+  if (rot === 270) return [0, h, -w, 0, w, 0];
+  return [w, 0, 0, h, 0, 0];
+}
+
 // Inverse transform: display coords (normalized) -> original page coords
 // Undoes the display rotation to recover storage coords.
 export function inverseTransformPt(nx, ny, rot) {
@@ -33,3 +50,45 @@ export function inverseTransformPt(nx, ny, rot) {
   if (rot === 270) { return [ny, 1.0 - nx]; }
   return [nx, ny];
 }
+
+// Ramer–Douglas–Peucker simplification of a pen stroke given as a flat
+// [x0, y0, x1, y1, ...] array in CSS pixels. Pointer events arrive far
+// denser than the line needs; dropping points that deviate less than
+// `epsilon` px from the chord keeps the shape while shrinking the sidecar
+// and every later redraw/hit-test. Returns a new flat array.
+export function simplifyStroke(pts, epsilon = 0.5) {
+  const n = pts.length >> 1;
+  if (n < 3) return pts.slice();
+  const keep = new Uint8Array(n);
+  keep[0] = keep[n - 1] = 1;
+  const eps2 = epsilon * epsilon;
+  const stack = [[0, n - 1]];
+  while (stack.length) {
+    const [first, last] = stack.pop();
+    const ax = pts[2 * first], ay = pts[2 * first + 1];
+    const dx = pts[2 * last] - ax, dy = pts[2 * last + 1] - ay;
+    const len2 = dx * dx + dy * dy;
+    let maxD2 = 0;
+    let idx = -1;
+    for (let i = first + 1; i < last; i++) {
+      const px = pts[2 * i] - ax, py = pts[2 * i + 1] - ay;
+      let d2;
+      if (len2 === 0) {
+        d2 = px * px + py * py;
+      } else {
+        const cross = px * dy - py * dx;
+        d2 = (cross * cross) / len2;
+      }
+      if (d2 > maxD2) { maxD2 = d2; idx = i; }
+    }
+    if (idx !== -1 && maxD2 > eps2) {
+      keep[idx] = 1;
+      stack.push([first, idx], [idx, last]);
+    }
+  }
+  const out = [];
+  for (let i = 0; i < n; i++) {
+    if (keep[i]) out.push(pts[2 * i], pts[2 * i + 1]);
+  }
+  return out;
+}
@@ -15,7 +15,7 @@ pdfjsLib.GlobalWorkerOptions.workerSrc = PDFJS_BASE + "/build/pdf.worker.min.mjs
 import { getState, resetViewerState, resetAnnotationState } from "./state.js";
 import {
   pdfContainer, canvas1, canvas2, annotCanvas1, annotCanvas2,
-  pageWrap2, pageInput, pageTotal, titleDisplay,
+  pageWrap1, pageWrap2, pageInput, pageTotal, titleDisplay,
   btnClose, btnZoomFit, btnZoomWide, btnSideBySide,
   btnPrev, btnNext, btnExport, btnFullscreen,
   libraryStatus, viewerToast,
@@ -128,9 +128,13 @@ async function loadAndRenderPdf(filepath, { startPage = 1 } = {}) {
   }
   if (!newDoc) throw lastErr;
 
-  // Commit state only after successful load
+  // Commit state only after successful load. The previous document is
+  // destroyed so pdf.js frees its worker-side parse state and page
+  // objects instead of holding them until the tab is closed.
+  const oldDoc = s.pdfDoc;
   resetAnnotationState();
   s.pdfDoc = newDoc;
+  if (oldDoc && oldDoc !== newDoc) oldDoc.destroy();
   s.annotations = annotData.pages || {};
   s.rotations = annotData.rotations || {};
   s.annotationEtag = annotData.etag || null;
@@ -187,8 +191,12 @@ export async function openScore(score) {
 }
 
 export function cleanupScore() {
+  const doc = getState().pdfDoc;
   cleanupAllPages();
+  clearResizePreview();
+  _renderedSize = null;
   resetViewerState();
+  if (doc) doc.destroy();
   setTool("nav");
   canvas1.width = 0;  canvas1.height = 0;
   canvas2.width = 0;  canvas2.height = 0;
@@ -258,16 +266,68 @@ export async function openSetlistSong(index, goToEnd = false, { autoAdvance = fa
 // Page rendering
 // ---------------------------------------------------------------------------
 
+// Container size and device pixel ratio at the last render — the baseline
+// for resize previews, and for skipping resizes that change neither.
+let _renderedSize = null;
+
+// While a resize is being debounced, CSS-scale the current pages towards
+// the new size so the layout tracks the window immediately; the debounced
+// renderPage then repaints crisply. Only for small changes — a big jump
+// would just show a blurry page for 150 ms.
+function previewResize() {
+  const s = getState();
+  if (!s.pdfDoc || !_renderedSize || !_renderedSize.w || !_renderedSize.h) return;
+  const sx = pdfContainer.clientWidth / _renderedSize.w;
+  const sy = pdfContainer.clientHeight / _renderedSize.h;
+  const k = s.displayMode === "wide" ? sx : Math.min(sx, sy);
+  if (Math.abs(k - 1) > 0.1) {
+    clearResizePreview();
+    return;
+  }
+  for (const wrap of [pageWrap1, pageWrap2]) {
+    wrap.style.transformOrigin = "top center";
+    wrap.style.transform = `scale(${k})`;
+  }
+}
+
+function clearResizePreview() {
+  pageWrap1.style.transform = "";
+  pageWrap2.style.transform = "";
+}
+
+// Set when renderPage is called while a render is already in flight, e.g.
+// page turns arriving faster than pdf.js can paint. The in-flight render
+// re-runs once on completion so the latest page wins, instead of the
+// request being dropped and the canvas lagging behind currentPage.
+let _renderQueued = false;
+
 export async function renderPage() {
   const s = getState();
-  if (!s.pdfDoc || s.rendering) return;
+  const doc = s.pdfDoc;
+  if (!doc) return;
+  if (s.rendering) {
+    _renderQueued = true;
+    return;
+  }
   s.rendering = true;
+  _renderQueued = false;
+  // Taken when the render starts, so a backward scroll-turn that arrives
+  // mid-render (and is queued) keeps its flag for the render of its page
+  // instead of the stale in-flight one using it up.
+  const scrollToBottom = s.scrollToBottomAfterRender;
+  s.scrollToBottomAfterRender = false;
 
   pageInput.value = s.currentPage;
   dbg("renderPage", { page: s.currentPage, mode: s.displayMode });
 
   try {
     s.pageLayouts = [];
+    clearResizePreview();
+    _renderedSize = {
+      w: pdfContainer.clientWidth,
+      h: pdfContainer.clientHeight,
+      dpr: window.devicePixelRatio || 1,
+    };
 
     const layout1 = await renderSinglePage(s.currentPage, canvas1, annotCanvas1);
     s.pageLayouts.push({ page: s.currentPage, ...layout1 });
@@ -284,29 +344,36 @@ export async function renderPage() {
 
     drawAnnotations();
     cleanupOldPages();
-    prefetchNextPage();
+    prefetchAdjacentPages();
 
-    if (s.scrollToBottomAfterRender) {
+    if (scrollToBottom) {
       pdfContainer.scrollTop = pdfContainer.scrollHeight;
-      s.scrollToBottomAfterRender = false;
     } else {
       pdfContainer.scrollTop = 0;
     }
     hideToast();
   } catch (err) {
+    // A render of a document that has since been replaced or closed is
+    // cancelled by its destroy(); that is not a failure worth reporting.
+    if (s.pdfDoc !== doc) return;
     console.error(VIEWER_TAG, "renderPage failed:", err);
     cleanupAllPages();
     const detail = err && err.message ? `: ${err.message}` : "";
     showToast(`Page ${s.currentPage} failed to render${detail} — press ←/→ to retry`);
   } finally {
     s.rendering = false;
+    if (_renderQueued) {
+      _renderQueued = false;
+      renderPage();
+    }
   }
 }
 
-async function renderSinglePage(pageNum, pdfCanvas, annotCanvas) {
+// Viewport and backing-store size for a page in the current display mode.
+// Shared by the on-screen render and the off-screen prerender so both
+// produce the same bitmap-cache key.
+function pageGeometry(page, pageNum) {
   const s = getState();
-  const page = await s.pdfDoc.getPage(pageNum);
-  s.cachedPages.set(pageNum, page);
   // PDF.js's getViewport({rotation}) OVERRIDES the page's intrinsic /Rotate
   // rather than adding to it. Combine them so PDFs that declare a non-zero
   // intrinsic rotation render in their canonical (Acrobat) orientation, with
@@ -322,35 +389,112 @@ async function renderSinglePage(pageNum, pdfCanvas, annotCanvas) {
   const unscaledViewport = page.getViewport({ scale: 1, rotation: totalRot });
   const scaleW = containerWidth / unscaledViewport.width;
   const scaleH = containerHeight / unscaledViewport.height;
-  const scale = s.displayMode === "wide" ? scaleW : Math.min(scaleW, scaleH);
+  const fitScale = s.displayMode === "wide" ? scaleW : Math.min(scaleW, scaleH);
+
+  // Snap the scale down so the page is a whole number of CSS pixels wide.
+  // Otherwise pdf.js paints a partial last column that the floored canvas
+  // then crops, and the backing store is not an exact dpr multiple of the
+  // CSS box, so the browser resamples the page when compositing it. Only
+  // one axis can be snapped by the scale; the height is cropped to whole
+  // CSS pixels, losing less than one pixel row at the page's bottom edge.
+  const cssW = Math.max(1, Math.floor(unscaledViewport.width * fitScale));
+  const scale = cssW / unscaledViewport.width;
 
   const viewport = page.getViewport({ scale, rotation: totalRot });
+  const cssH = Math.max(1, Math.floor(viewport.height));
+  // One set of backing-store dimensions, shared by the page and the
+  // annotation canvas stacked on it so the two layers stay aligned.
   const dpr = window.devicePixelRatio || 1;
+  const pxW = Math.round(cssW * dpr);
+  const pxH = Math.round(cssH * dpr);
 
-  const cssW = Math.floor(viewport.width);
-  const cssH = Math.floor(viewport.height);
-
-  pdfCanvas.width = Math.floor(viewport.width * dpr);
-  pdfCanvas.height = Math.floor(viewport.height * dpr);
-  pdfCanvas.style.width = cssW + "px";
-  pdfCanvas.style.height = cssH + "px";
+  return {
+    viewport, dpr, pxW, pxH, cssW, cssH,
+    key: `${pageNum}:${totalRot}:${pxW}x${pxH}`,
+  };
+}
 
-  const ctx = pdfCanvas.getContext("2d");
-  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
-  await page.render({ canvasContext: ctx, viewport }).promise;
+async function renderSinglePage(pageNum, pdfCanvas, annotCanvas) {
+  const s = getState();
+  const doc = s.pdfDoc;
+  const page = await doc.getPage(pageNum);
+  s.cachedPages.set(pageNum, page);
+  const { viewport, dpr, pxW, pxH, cssW, cssH, key } = pageGeometry(page, pageNum);
+
+  sizeCanvas(pdfCanvas, pxW, pxH, cssW, cssH);
+
+  // The page layer is always fully painted (pdf.js fills the page
+  // background), so an opaque context lets the browser skip alpha
+  // blending when compositing it under the annotation canvas.
+  const ctx = pdfCanvas.getContext("2d", { alpha: false });
+  const hit = s.renderedBitmaps.get(key);
+  if (hit) {
+    // Re-insert to mark as most recently used
+    s.renderedBitmaps.delete(key);
+    s.renderedBitmaps.set(key, hit);
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.drawImage(hit, 0, 0);
+  } else {
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    await page.render({ canvasContext: ctx, viewport }).promise;
+    rememberRenderedPage(key, pdfCanvas, doc);
+  }
 
-  annotCanvas.width = Math.floor(cssW * dpr);
-  annotCanvas.height = Math.floor(cssH * dpr);
-  annotCanvas.style.width = cssW + "px";
-  annotCanvas.style.height = cssH + "px";
+  sizeCanvas(annotCanvas, pxW, pxH, cssW, cssH);
 
   return { cssW, cssH };
 }
 
+// Assigning canvas.width/height reallocates and clears the backing store
+// even when the value is unchanged, so only touch them on a real size
+// change. Both layers are fully repainted each render (the page is opaque,
+// drawPageAnnotations clears first), so reusing the buffer is safe.
+function sizeCanvas(canvas, w, h, cssW, cssH) {
+  if (canvas.width !== w) canvas.width = w;
+  if (canvas.height !== h) canvas.height = h;
+  const sw = cssW + "px";
+  const sh = cssH + "px";
+  if (canvas.style.width !== sw) canvas.style.width = sw;
+  if (canvas.style.height !== sh) canvas.style.height = sh;
+}
+
 // ---------------------------------------------------------------------------
 // Page cache management
 // ---------------------------------------------------------------------------
 
+// Rendered pages are kept as ImageBitmaps so flipping back and forth (or
+// the 2-up spread re-showing a page) blits pixels instead of re-rasterizing.
+// Keyed by page, rotation and backing-store size; a full-screen page at 2x
+// DPR is ~20 MB, so keep only a handful. Four is the working set of a 2-up
+// forward turn (the spread on screen plus the prefetched next one); touch
+// devices — in practice the iPad, where Safari caps total canvas memory —
+// keep just that. Desktops keep two more so flipping back is also a blit.
+const RENDER_CACHE_SIZE = navigator.maxTouchPoints > 0 ? 4 : 6;
+
+// *doc* is the document the canvas was rendered from, captured when the
+// render started: the key only identifies page, rotation and size, so a
+// render that resolves after a document switch must not be stored under it.
+// Returns the snapshot promise, so a caller can release the source canvas
+// once the bitmap has been taken.
+function rememberRenderedPage(key, pdfCanvas, doc) {
+  if (typeof createImageBitmap !== "function") return Promise.resolve();
+  const s = getState();
+  if (s.pdfDoc !== doc) return Promise.resolve();
+  return createImageBitmap(pdfCanvas).then((bmp) => {
+    // Document changed while the render or snapshot was pending
+    if (s.pdfDoc !== doc) { bmp.close(); return; }
+    const old = s.renderedBitmaps.get(key);
+    if (old) old.close();
+    s.renderedBitmaps.delete(key);
+    s.renderedBitmaps.set(key, bmp);
+    while (s.renderedBitmaps.size > RENDER_CACHE_SIZE) {
+      const [oldest, oldBmp] = s.renderedBitmaps.entries().next().value;
+      oldBmp.close();
+      s.renderedBitmaps.delete(oldest);
+    }
+  }).catch(() => { /* caching is best-effort */ });
+}
+
 function cleanupOldPages() {
   const s = getState();
   const hot = new Set();
@@ -375,16 +519,53 @@ function cleanupAllPages() {
   s.cachedPages.clear();
 }
 
-async function prefetchNextPage() {
+// After a render, rasterize the pages the next forward turn will show into
+// the bitmap cache (off-screen), so that turn is a blit. The page before
+// is only fetched, not rendered — backward turns are rarer and usually hit
+// a bitmap that was on screen a moment ago.
+async function prefetchAdjacentPages() {
   const s = getState();
-  if (!s.pdfDoc) return;
+  const doc = s.pdfDoc;
+  if (!doc) return;
   const step = s.displayMode === "2up" ? 2 : 1;
   const next = s.currentPage + step;
-  if (next <= s.totalPages && !s.cachedPages.has(next)) {
-    try {
-      const page = await s.pdfDoc.getPage(next);
-      s.cachedPages.set(next, page);
-    } catch { /* ignore prefetch failures */ }
+  const ahead = [];
+  for (let p = next; p < next + step && p <= s.totalPages; p++) ahead.push(p);
+  const prev = s.currentPage - step;
+
+  try {
+    for (const p of ahead) {
+      if (s.pdfDoc !== doc || s.rendering) return;
+      await prerenderPage(doc, p);
+    }
+    if (prev >= 1 && !s.cachedPages.has(prev) && s.pdfDoc === doc) {
+      s.cachedPages.set(prev, await doc.getPage(prev));
+    }
+  } catch { /* ignore prefetch failures */ }
+}
+
+async function prerenderPage(doc, pageNum) {
+  const s = getState();
+  const page = (s.pdfDoc === doc && s.cachedPages.get(pageNum)) || await doc.getPage(pageNum);
+  if (s.pdfDoc !== doc) return;
+  s.cachedPages.set(pageNum, page);
+  const { viewport, dpr, pxW, pxH, key } = pageGeometry(page, pageNum);
+  if (s.renderedBitmaps.has(key)) return;
+
+  const off = document.createElement("canvas");
+  off.width = pxW;
+  off.height = pxH;
+  try {
+    const ctx = off.getContext("2d", { alpha: false });
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    await page.render({ canvasContext: ctx, viewport }).promise;
+    await rememberRenderedPage(key, off, doc);
+  } finally {
+    // Release the backing store now rather than whenever the detached
+    // canvas is collected — iOS Safari frees those lazily and counts them
+    // against its canvas memory limit until then.
+    off.width = 0;
+    off.height = 0;
   }
 }
 
@@ -595,12 +776,25 @@ export function initViewerEvents() {
     }
   });
 
-  // Resize handler — debounced
+  // Resize handler — debounced. Browsers also fire resize for changes that
+  // leave the viewer's box as it was (e.g. mobile URL bar show/hide on an
+  // element that doesn't track it), so skip the re-render unless the
+  // container size differs from the one the current pages were rendered at.
   let resizeTimer = null;
   window.addEventListener("resize", () => {
+    previewResize();
     if (resizeTimer) clearTimeout(resizeTimer);
     resizeTimer = setTimeout(async () => {
       const s = getState();
+      // A DPR-only change (window moved to another display) still needs a
+      // re-render at the new backing-store resolution.
+      if (_renderedSize
+          && _renderedSize.w === pdfContainer.clientWidth
+          && _renderedSize.h === pdfContainer.clientHeight
+          && _renderedSize.dpr === (window.devicePixelRatio || 1)) {
+        clearResizePreview();
+        return;
+      }
       if (s.pdfDoc) {
         await checkAutoSideBySide();
         renderPage();